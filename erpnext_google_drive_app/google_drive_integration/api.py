@@ -5,12 +5,21 @@ from typing import Any
 
 import frappe
 import requests
-from frappe.utils import now_datetime
+from frappe.utils import cint, flt, get_datetime, now_datetime
 
+from erpnext_google_drive_app.google_drive_integration.doctype.google_drive_settings.google_drive_settings import (
+    get_drive_client,
+    save_refreshed_token,
+)
+from erpnext_google_drive_app.google_drive_integration.folder_cache import (
+    get_cached_page,
+    set_cached_page,
+)
 from erpnext_google_drive_app.google_drive_integration.google_drive_client import (
     GoogleAuthError,
     GoogleDriveClient,
 )
+from erpnext_google_drive_app.google_drive_integration.upload_scheduler import BACKFILL, queue_pending_uploads
 
 
 SCOPES_DEFAULT = [
@@ -23,19 +32,9 @@ def _get_settings():
     return frappe.get_single("Google Drive Settings")
 
 
-def _get_client(settings: Any) -> GoogleDriveClient:
-    settings.reload()
-    client_secret = settings.get_password(fieldname="client_secret", raise_exception=False) or ""
-    access_token = settings.get_password(fieldname="access_token", raise_exception=False)
-    refresh_token = settings.get_password(fieldname="refresh_token", raise_exception=False)
-    return GoogleDriveClient(
-        client_id=settings.client_id or "",
-        client_secret=client_secret,
-        redirect_uri=settings.redirect_uri or "",
-        access_token=access_token,
-        refresh_token=refresh_token,
-        token_expires_at=settings.token_expires_at or None,
-    )
+def _get_client() -> GoogleDriveClient:
+    # Shared per-process client; rebuilt only after Google Drive Settings is saved
+    return get_drive_client()
 
 
 @frappe.whitelist()
@@ -44,7 +43,7 @@ def get_google_auth_url() -> dict[str, Any]:
     if not settings.client_id or not settings.redirect_uri:
         frappe.throw("Set Client ID and Redirect URI in Google Drive Settings first.")
 
-    client = _get_client(settings)
+    client = _get_client()
     state = "erpnext-google-drive"
     url = client.build_auth_url(scopes=SCOPES_DEFAULT, state=state)
     return {"auth_url": url}
@@ -78,7 +77,7 @@ def google_oauth_callback(code: str | None = None, state: str | None = None):
             )
             return
 
-        client = _get_client(settings)
+        client = _get_client()
         token_data = client.exchange_code_for_token(code)
 
         settings.access_token = token_data.get("access_token")
@@ -106,7 +105,7 @@ def google_oauth_callback(code: str | None = None, state: str | None = None):
 @frappe.whitelist()
 def test_google_drive_connection() -> dict[str, Any]:
     settings = _get_settings()
-    client = _get_client(settings)
+    client = _get_client()
 
     # Must have connected at least once (need access_token or refresh_token)
     if not client.access_token and not client.refresh_token:
@@ -166,9 +165,181 @@ def test_google_drive_connection() -> dict[str, Any]:
         return {"ok": False, "message": friendly}
 
 
+# Which Google Drive Project Folder field holds each browsable folder
+_PROJECT_FOLDER_FIELDS = {
+    "project": "drive_folder_id",
+    "before": "before_folder_id",
+    "after": "after_folder_id",
+}
+
+
+@frappe.whitelist()
+def list_project_drive_folder(
+    project: str,
+    folder: str = "Project",
+    page_token: str | None = None,
+    page_size: int = 50,
+    refresh: int = 0,
+) -> dict[str, Any]:
+    """
+    One page of a project's Drive folder (Project, Before or After).
+    Pages are cached in Redis per folder and page token; pass refresh=1 to bypass the cache.
+    """
+    frappe.has_permission("Project", "read", project, throw=True)
+
+    fieldname = _PROJECT_FOLDER_FIELDS.get((folder or "project").lower())
+    if not fieldname:
+        frappe.throw("Folder must be one of: Project, Before, After.")
+
+    folder_id = frappe.db.get_value("Google Drive Project Folder", project, fieldname)
+    if not folder_id:
+        return {"folder_id": None, "files": [], "next_page_token": None, "cached": False}
+
+    page_size = min(max(cint(page_size) or 50, 1), 200)
+    page_token = page_token or None
+
+    if not cint(refresh):
+        page = get_cached_page(folder_id, page_token, page_size)
+        if page is not None:
+            return {
+                "folder_id": folder_id,
+                "files": page.get("files") or [],
+                "next_page_token": page.get("nextPageToken"),
+                "cached": True,
+            }
+
+    client = _get_client()
+    page = client.list_folder(folder_id=folder_id, page_size=page_size, page_token=page_token)
+    save_refreshed_token(client)
+
+    set_cached_page(folder_id, page_token, page_size, page)
+    return {
+        "folder_id": folder_id,
+        "files": page.get("files") or [],
+        "next_page_token": page.get("nextPageToken"),
+        "cached": False,
+    }
+
+
+@frappe.whitelist()
+def backfill_project_photo_uploads(project: str | None = None) -> dict[str, Any]:
+    """
+    Queue all not-yet-uploaded Project Photos (optionally for one project) at backfill
+    priority, so they never delay photos users are saving right now.
+    """
+    frappe.only_for("System Manager")
+    queued = queue_pending_uploads(BACKFILL, project=project or None)
+    return {"queued": queued}
+
+
+_PHOTO_SEARCH_FIELDS = [
+    "name",
+    "project",
+    "stage",
+    "photo",
+    "google_drive_url",
+    "captured_at",
+    "camera_make",
+    "camera_model",
+    "gps_latitude",
+    "gps_longitude",
+    "image_width",
+    "image_height",
+]
+
+
+@frappe.whitelist()
+def search_project_photos(
+    project: str | None = None,
+    stage: str | None = None,
+    captured_from: str | None = None,
+    captured_to: str | None = None,
+    camera_make: str | None = None,
+    camera_model: str | None = None,
+    min_lat: float | None = None,
+    min_lng: float | None = None,
+    max_lat: float | None = None,
+    max_lng: float | None = None,
+    start: int = 0,
+    limit: int = 100,
+) -> list[dict[str, Any]]:
+    """
+    Project Photos by EXIF metadata, newest capture first. All filters are optional
+    and use exact/range matches on indexed columns. Pass all four of min/max lat/lng
+    for a bounding box; min_lng > max_lng means the box crosses the antimeridian.
+    """
+    filters: list[list[Any]] = []
+    or_filters: list[list[Any]] = []
+    for fieldname, value in (
+        ("project", project),
+        ("stage", stage),
+        ("camera_make", camera_make),
+        ("camera_model", camera_model),
+    ):
+        if value:
+            filters.append([fieldname, "=", value])
+    if captured_from:
+        filters.append(["captured_at", ">=", get_datetime(captured_from)])
+    if captured_to:
+        filters.append(["captured_at", "<=", get_datetime(captured_to)])
+
+    bbox = (min_lat, min_lng, max_lat, max_lng)
+    if any(v not in (None, "") for v in bbox):
+        if any(v in (None, "") for v in bbox):
+            frappe.throw("Bounding box needs min_lat, min_lng, max_lat and max_lng.")
+        min_lat, min_lng, max_lat, max_lng = (flt(v) for v in bbox)
+        filters.append(["gps_latitude", ">=", min(min_lat, max_lat)])
+        filters.append(["gps_latitude", "<=", max(min_lat, max_lat)])
+        if min_lng <= max_lng:
+            filters.append(["gps_longitude", ">=", min_lng])
+            filters.append(["gps_longitude", "<=", max_lng])
+        else:
+            or_filters = [["gps_longitude", ">=", min_lng], ["gps_longitude", "<=", max_lng]]
+
+    return frappe.get_list(
+        "Project Photo",
+        filters=filters,
+        or_filters=or_filters or None,
+        fields=_PHOTO_SEARCH_FIELDS,
+        order_by="captured_at desc",
+        limit_start=max(cint(start), 0),
+        limit_page_length=min(max(cint(limit) or 100, 1), 1000),
+    )
+
+
+@frappe.whitelist()
+def search_project_photos_in_bbox(
+    min_lat: float,
+    min_lng: float,
+    max_lat: float,
+    max_lng: float,
+    project: str | None = None,
+    captured_from: str | None = None,
+    captured_to: str | None = None,
+    start: int = 0,
+    limit: int = 100,
+) -> list[dict[str, Any]]:
+    """Project Photos whose GPS position falls inside the given bounding box."""
+    return search_project_photos(
+        project=project,
+        captured_from=captured_from,
+        captured_to=captured_to,
+        min_lat=min_lat,
+        min_lng=min_lng,
+        max_lat=max_lat,
+        max_lng=max_lng,
+        start=start,
+        limit=limit,
+    )
+
+
 __all__ = [
+    "backfill_project_photo_uploads",
     "get_google_auth_url",
     "google_oauth_callback",
+    "list_project_drive_folder",
+    "search_project_photos",
+    "search_project_photos_in_bbox",
     "test_google_drive_connection",
 ]
 
@@ -1,18 +1,28 @@
 from __future__ import annotations
 
+import threading
+
 import frappe
 from frappe.model.document import Document
+from frappe.utils import get_datetime
 
 from erpnext_google_drive_app.google_drive_integration.google_drive_client import (
     GoogleDriveClient,
 )
+from erpnext_google_drive_app.google_drive_integration.response_cache import RedisResponseCache
 
 
 class GoogleDriveSettings(Document):
+    def on_update(self):
+        clear_settings_snapshot()
+        # Again after commit, in case another request re-cached the old values meanwhile
+        frappe.db.after_commit.add(clear_settings_snapshot)
+
     def get_client(self) -> GoogleDriveClient:
-        client_secret = self.get_password("client_secret") or ""
-        access_token = self.get_password("access_token") if self.access_token else None
-        refresh_token = self.get_password("refresh_token") if self.refresh_token else None
+        # Missing secrets must not raise: the API endpoints report them as friendly messages
+        client_secret = self.get_password(fieldname="client_secret", raise_exception=False) or ""
+        access_token = self.get_password(fieldname="access_token", raise_exception=False)
+        refresh_token = self.get_password(fieldname="refresh_token", raise_exception=False)
         return GoogleDriveClient(
             client_id=self.client_id or "",
             client_secret=client_secret,
@@ -20,8 +30,110 @@ class GoogleDriveSettings(Document):
             access_token=access_token,
             refresh_token=refresh_token,
             token_expires_at=self.token_expires_at or None,
+            response_cache=RedisResponseCache(),
         )
 
 
-__all__ = ["GoogleDriveSettings"]
+# ---------------- Cached settings snapshot ----------------
+
+_SNAPSHOT_KEY = "google_drive_settings_snapshot"
+# Backstop for changes that bypass on_update (e.g. frappe.db.set_single_value)
+_SNAPSHOT_TTL_SECONDS = 3600
+# Non-secret fields only; Password fields are decrypted in-process by get_drive_client
+_SNAPSHOT_FIELDS = (
+    "client_id",
+    "redirect_uri",
+    "root_folder_id",
+    "before_folder_name",
+    "after_folder_name",
+    "auto_create_project_folder",
+    "auto_upload_project_photos",
+)
+
+
+def get_settings_snapshot() -> frappe._dict:
+    """
+    Google Drive Settings values needed on hot paths (doc events, jobs), read with a
+    single cache lookup. `version` changes whenever the Single is saved.
+    """
+    cache = frappe.cache()
+    snapshot = cache.get_value(_SNAPSHOT_KEY, expires=True)
+    if snapshot is None:
+        settings = frappe.get_single("Google Drive Settings")
+        snapshot = {fieldname: settings.get(fieldname) for fieldname in _SNAPSHOT_FIELDS}
+        snapshot["has_access_token"] = bool(settings.access_token)
+        snapshot["has_refresh_token"] = bool(settings.refresh_token)
+        snapshot["version"] = str(settings.modified)
+        cache.set_value(_SNAPSHOT_KEY, snapshot, expires_in_sec=_SNAPSHOT_TTL_SECONDS)
+    return frappe._dict(snapshot)
+
+
+def clear_settings_snapshot() -> None:
+    frappe.cache().delete_value(_SNAPSHOT_KEY)
+
+
+# ---------------- Per-process client context ----------------
+
+
+class _ClientContext:
+    __slots__ = ("version", "client", "saved_token")
+
+    def __init__(self, version: str, client: GoogleDriveClient):
+        self.version = version
+        self.client = client
+        self.saved_token = _token_state(client)
+
+
+def _token_state(client: GoogleDriveClient) -> tuple:
+    # Expiry may be a DB string before ensure_valid_token normalizes it; compare as datetime
+    return (client.access_token, get_datetime(client.token_expires_at) if client.token_expires_at else None)
+
+
+# One client per site in this worker process, rebuilt when the settings version changes
+_client_contexts: dict[str, _ClientContext] = {}
+_client_contexts_lock = threading.Lock()
+
+
+def get_drive_client(snapshot: frappe._dict | None = None) -> GoogleDriveClient:
+    """
+    Reusable GoogleDriveClient for this process. Secrets are decrypted and the HTTP
+    session created only when the settings version changes, not on every call.
+    """
+    snapshot = snapshot or get_settings_snapshot()
+    site = frappe.local.site
+    with _client_contexts_lock:
+        context = _client_contexts.get(site)
+        if context and context.version == snapshot.version:
+            return context.client
+
+    client = frappe.get_single("Google Drive Settings").get_client()
+    with _client_contexts_lock:
+        _client_contexts[site] = _ClientContext(snapshot.version, client)
+    return client
+
+
+def save_refreshed_token(client: GoogleDriveClient) -> None:
+    """Persist the shared client's access token if it was refreshed since it was last saved."""
+    context = _client_contexts.get(frappe.local.site)
+    current = _token_state(client)
+    if not context or context.client is not client or context.saved_token == current:
+        return
+
+    settings = frappe.get_single("Google Drive Settings")
+    settings.access_token = client.access_token
+    settings.token_expires_at = client.token_expires_at
+    settings.save(ignore_permissions=True)
+    frappe.db.commit()
+
+    # Our own save bumped the version; keep using this client instead of rebuilding
+    context.saved_token = current
+    context.version = str(settings.modified)
+
 
+__all__ = [
+    "GoogleDriveSettings",
+    "clear_settings_snapshot",
+    "get_drive_client",
+    "get_settings_snapshot",
+    "save_refreshed_token",
+]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import mimetypes
+import time
 from pathlib import Path
 
 import frappe
@@ -11,35 +12,23 @@ from frappe.utils.file_manager import get_file_path
 from erpnext_google_drive_app.google_drive_integration.doctype.google_drive_project_folder.google_drive_project_folder import (
     get_by_project,
 )
+from erpnext_google_drive_app.google_drive_integration.doctype.google_drive_settings.google_drive_settings import (
+    get_drive_client,
+    get_settings_snapshot,
+    save_refreshed_token,
+)
+from erpnext_google_drive_app.google_drive_integration.folder_cache import invalidate_folder_listing
 from erpnext_google_drive_app.google_drive_integration.google_drive_client import GoogleDriveClient
-
-
-def _get_settings():
-    return frappe.get_single("Google Drive Settings")
+from erpnext_google_drive_app.google_drive_integration.photo_metadata import read_photo_metadata
+from erpnext_google_drive_app.google_drive_integration.upload_scheduler import INTERACTIVE, schedule_upload
 
 
 def _get_client(settings) -> GoogleDriveClient:
-    client_secret = settings.get_password("client_secret") or ""
-    access_token = settings.get_password("access_token") if settings.access_token else None
-    refresh_token = settings.get_password("refresh_token") if settings.refresh_token else None
-    client = GoogleDriveClient(
-        client_id=settings.client_id or "",
-        client_secret=client_secret,
-        redirect_uri=settings.redirect_uri or "",
-        access_token=access_token,
-        refresh_token=refresh_token,
-        token_expires_at=settings.token_expires_at or None,
-    )
+    client = get_drive_client(settings)
     # refresh if needed and persist
-    before_access = client.access_token
-    before_exp = client.token_expires_at
     if client.access_token:
         client.ensure_valid_token()
-    if client.access_token != before_access or client.token_expires_at != before_exp:
-        settings.access_token = client.access_token
-        settings.token_expires_at = client.token_expires_at
-        settings.save(ignore_permissions=True)
-        frappe.db.commit()
+    save_refreshed_token(client)
     return client
 
 
@@ -66,6 +55,7 @@ def _ensure_before_after_folders(mapping, client: GoogleDriveClient, settings):
     if updated:
         mapping.save(ignore_permissions=True)
         frappe.db.commit()
+        invalidate_folder_listing(mapping.drive_folder_id)
     return mapping
 
 
@@ -113,9 +103,53 @@ def _ensure_project_folders(project_name: str, client: GoogleDriveClient, settin
         mapping.insert(ignore_permissions=True)
 
     frappe.db.commit()
+    invalidate_folder_listing(parent_id, project_folder_id)
     return mapping
 
 
+# Seconds a job waits for another job's Drive folder setup of the same project
+_FOLDER_SETUP_WAIT_SECONDS = 60
+_FOLDER_SETUP_LOCK_SECONDS = 300
+
+
+def _get_upload_mapping(project_name: str, client: GoogleDriveClient, settings):
+    """Project folder mapping with Before/After folders, set up by one job at a time per project."""
+    mapping = get_by_project(project_name)
+    if mapping and mapping.drive_folder_id and mapping.before_folder_id and mapping.after_folder_id:
+        return mapping
+
+    # Concurrent drain jobs would otherwise race on get_or_create_folder (duplicate
+    # Drive folders) and on inserting the mapping (duplicate name)
+    cache = frappe.cache()
+    lock = cache.make_key(f"google_drive_folder_setup|{project_name}")
+    deadline = time.monotonic() + _FOLDER_SETUP_WAIT_SECONDS
+    while not cache.set(lock, 1, nx=True, ex=_FOLDER_SETUP_LOCK_SECONDS):
+        if time.monotonic() >= deadline:
+            frappe.throw(f"Timed out waiting for Drive folder setup of project {project_name}.")
+        time.sleep(0.5)
+
+    try:
+        # Start a fresh transaction so a mapping committed while we waited is visible
+        frappe.db.commit()
+        if settings.auto_create_project_folder:
+            return _ensure_project_folders(project_name, client, settings)
+
+        mapping = get_by_project(project_name)
+        if not mapping or not mapping.drive_folder_id:
+            frappe.throw(
+                "Drive folder mapping not found. Enable auto-create project folder or create a Google Drive Project Folder record."
+            )
+        # Ensure both Before and After subfolders exist so both can be used for this project
+        return _ensure_before_after_folders(mapping, client, settings)
+    finally:
+        cache.delete(lock)
+
+
+# appProperties key set on files uploaded from a Project Photo, so the Drive
+# ingest can tell them apart from photos added directly in Drive
+DRIVE_APP_PROPERTY = "erpnextProjectPhoto"
+
+
 class ProjectPhoto(Document):
     def after_insert(self):
         self._maybe_upload()
@@ -124,7 +158,8 @@ class ProjectPhoto(Document):
         self._maybe_upload()
 
     def _maybe_upload(self):
-        settings = _get_settings()
+        # Settings snapshot is one cache read, so saves with auto-upload off cost nothing else
+        settings = get_settings_snapshot()
         if not settings.auto_upload_project_photos:
             return
 
@@ -134,18 +169,21 @@ class ProjectPhoto(Document):
         if not self.photo:
             return
 
+        # Fail the save early rather than in the background job
+        if not settings.auto_create_project_folder and not frappe.db.get_value(
+            "Google Drive Project Folder", self.project, "drive_folder_id"
+        ):
+            frappe.throw(
+                "Drive folder mapping not found. Enable auto-create project folder or create a Google Drive Project Folder record."
+            )
+
+        schedule_upload(self.name, self.project, INTERACTIVE)
+
+    def upload_to_drive(self, settings=None):
+        settings = settings or get_settings_snapshot()
         client = _get_client(settings)
 
-        if settings.auto_create_project_folder:
-            mapping = _ensure_project_folders(self.project, client, settings)
-        else:
-            mapping = get_by_project(self.project)
-            if not mapping or not mapping.drive_folder_id:
-                frappe.throw(
-                    "Drive folder mapping not found. Enable auto-create project folder or create a Google Drive Project Folder record."
-                )
-            # Ensure both Before and After subfolders exist so both can be used for this project
-            mapping = _ensure_before_after_folders(mapping, client, settings)
+        mapping = _get_upload_mapping(self.project, client, settings)
 
         target_folder_id = mapping.before_folder_id if self.stage == "Before" else mapping.after_folder_id
         if not target_folder_id:
@@ -155,19 +193,46 @@ class ProjectPhoto(Document):
         path = Path(get_file_path(file_url))
         filename = path.name
         mime_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
-        content_bytes = path.read_bytes()
+        # One pass over the file: EXIF from the header, then the bytes to upload
+        with path.open("rb") as fh:
+            self.update(read_photo_metadata(fh))
+            fh.seek(0)
+            content_bytes = fh.read()
 
         uploaded = client.upload_file(
             filename=filename,
             content_bytes=content_bytes,
             parent_id=target_folder_id,
             mime_type=mime_type,
+            app_properties={DRIVE_APP_PROPERTY: self.name},
         )
         self.google_drive_file_id = uploaded.get("id")
         self.google_drive_url = uploaded.get("webViewLink")
         self.uploaded_at = now_datetime()
         self.db_update()
+        invalidate_folder_listing(target_folder_id)
+
 
+def on_doctype_update():
+    # Composite indexes for the photo search API (bounding box, per-project date range)
+    frappe.db.add_index("Project Photo", ["gps_latitude", "gps_longitude"])
+    frappe.db.add_index("Project Photo", ["project", "captured_at"])
 
-__all__ = ["ProjectPhoto"]
 
+def upload_project_photo(name: str) -> bool:
+    """
+    Upload one queued Project Photo. Returns False if the row is missing or has no
+    file yet, so the scheduler can try again later; True once it is in Drive.
+    """
+    if not frappe.db.exists("Project Photo", name):
+        return False
+    photo = frappe.get_doc("Project Photo", name)
+    if photo.google_drive_file_id:
+        return True
+    if not photo.photo:
+        return False
+    photo.upload_to_drive()
+    return True
+
+
+__all__ = ["DRIVE_APP_PROPERTY", "ProjectPhoto", "upload_project_photo"]
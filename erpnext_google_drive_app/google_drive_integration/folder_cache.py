@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import frappe
+
+
+# One Redis hash per Drive folder; each field is one listing page.
+_CACHE_PREFIX = "google_drive_folder_listing"
+# Upper bound on staleness for Drive-side changes the ingest job does not see (renames, deletes).
+LISTING_TTL_SECONDS = 300
+
+
+def _cache_name(folder_id: str) -> str:
+    return f"{_CACHE_PREFIX}|{folder_id}"
+
+
+def _page_key(page_token: str | None, page_size: int) -> str:
+    return f"{page_size}|{page_token or ''}"
+
+
+def get_cached_page(folder_id: str, page_token: str | None, page_size: int) -> dict[str, Any] | None:
+    entry = frappe.cache().hget(_cache_name(folder_id), _page_key(page_token, page_size))
+    if not entry or time.time() - entry.get("cached_at", 0) > LISTING_TTL_SECONDS:
+        return None
+    return entry.get("page")
+
+
+def set_cached_page(folder_id: str, page_token: str | None, page_size: int, page: dict[str, Any]) -> None:
+    cache = frappe.cache()
+    name = _cache_name(folder_id)
+    cache.hset(name, _page_key(page_token, page_size), {"cached_at": time.time(), "page": page})
+    # Let Redis drop folders nobody browses any more
+    cache.expire(cache.make_key(name), LISTING_TTL_SECONDS)
+
+
+def invalidate_folder_listing(*folder_ids: str | None) -> None:
+    """Drop all cached pages for the given folders (e.g. after an upload into them)."""
+    for folder_id in folder_ids:
+        if folder_id:
+            frappe.cache().delete_key(_cache_name(folder_id))
+
+
+__all__ = ["get_cached_page", "set_cached_page", "invalidate_folder_listing", "LISTING_TTL_SECONDS"]
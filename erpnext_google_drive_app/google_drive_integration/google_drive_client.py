@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import copy
 import datetime as dt
+import hashlib
 import json
 import logging
 import mimetypes
 import secrets
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Dict, List, Optional, Protocol
 
 import requests
 
@@ -16,11 +19,28 @@ class GoogleAuthError(RuntimeError):
     pass
 
 
+class ResponseCache(Protocol):
+    """Storage for conditional GETs: entries are {"etag": ..., "body": ...}."""
+
+    def get(self, key: str) -> dict[str, Any] | None: ...
+
+    def set(self, key: str, entry: dict[str, Any]) -> None: ...
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
 class GoogleDriveClient:
     AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
     TOKEN_URL = "https://oauth2.googleapis.com/token"
     DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files"
     DRIVE_UPLOAD_URL = "https://www.googleapis.com/upload/drive/v3/files"
+    # Narrow field mask for folder listings; extend only when a caller needs more.
+    LIST_FIELDS = "nextPageToken,files(id,name,mimeType,modifiedTime,size,webViewLink,thumbnailLink)"
 
     def __init__(
         self,
@@ -31,6 +51,7 @@ class GoogleDriveClient:
         access_token: str | None = None,
         refresh_token: str | None = None,
         token_expires_at: dt.datetime | None = None,
+        response_cache: ResponseCache | None = None,
     ):
         self.client_id = client_id
         self.client_secret = client_secret
@@ -38,6 +59,7 @@ class GoogleDriveClient:
         self.access_token = access_token
         self.refresh_token = refresh_token
         self.token_expires_at = token_expires_at
+        self.response_cache = response_cache
         self._session = requests.Session()
 
     # ---------------- OAuth ----------------
@@ -114,14 +136,82 @@ class GoogleDriveClient:
         self.ensure_valid_token()
         return {"Authorization": f"Bearer {self.access_token}"}
 
+    # Identical metadata GETs in flight in this process, shared across clients
+    _inflight: Dict[str, _InFlight] = {}
+    _inflight_lock = threading.Lock()
+
+    def _cache_key(self, url: str, params: Dict[str, Any]) -> str:
+        # Keyed by the authorized account (its refresh token), not the access token, so
+        # entries survive token refreshes but sites sharing an OAuth client never share
+        # results. Falls back to the access token for clients without a refresh token.
+        account = self.refresh_token or self.access_token or ""
+        raw = json.dumps([self.client_id, account, url, sorted(params.items())], default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _get_json(self, url: str, params: Dict[str, Any]) -> dict[str, Any]:
+        """
+        GET for metadata reads. Identical concurrent requests are collapsed into one,
+        and when a response cache is set, bodies are revalidated with If-None-Match so
+        unchanged resources cost a 304 instead of a full download.
+        """
+        key = self._cache_key(url, params)
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = _InFlight()
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return copy.deepcopy(pending.result)
+
+        try:
+            pending.result = self._conditional_get(key, url, params)
+            return pending.result
+        except BaseException as exc:
+            pending.error = exc
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            pending.done.set()
+
+    def _conditional_get(self, key: str, url: str, params: Dict[str, Any]) -> dict[str, Any]:
+        headers = self._headers()
+        cached = None
+        if self.response_cache is not None:
+            try:
+                cached = self.response_cache.get(key)
+            except Exception:
+                logger.warning("Google Drive response cache read failed", exc_info=True)
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        resp = self._session.get(url, headers=headers, params=params, timeout=30)
+        if resp.status_code == 304 and cached:
+            return cached["body"]
+        resp.raise_for_status()
+        body = resp.json()
+
+        etag = resp.headers.get("ETag")
+        if etag and self.response_cache is not None:
+            try:
+                self.response_cache.set(key, {"etag": etag, "body": body})
+            except Exception:
+                logger.warning("Google Drive response cache write failed", exc_info=True)
+        return body
+
     def test_connection(self) -> dict[str, Any]:
         """
         Lightweight call to confirm auth works: list 1 file.
         """
         params = {"pageSize": 1, "fields": "files(id,name)"}
-        resp = self._session.get(self.DRIVE_FILES_URL, headers=self._headers(), params=params, timeout=30)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get_json(self.DRIVE_FILES_URL, params)
+
+    def get_file(self, file_id: str, *, fields: str = "id,name,mimeType,modifiedTime,parents,webViewLink") -> dict[str, Any]:
+        return self._get_json(f"{self.DRIVE_FILES_URL}/{file_id}", {"fields": fields})
 
     # ---------------- Drive: folders ----------------
 
@@ -140,9 +230,7 @@ class GoogleDriveClient:
             q.append("'root' in parents")
 
         params = {"q": " and ".join(q), "fields": "files(id,name)", "pageSize": 1}
-        resp = self._session.get(self.DRIVE_FILES_URL, headers=self._headers(), params=params, timeout=30)
-        resp.raise_for_status()
-        files = resp.json().get("files") or []
+        files = self._get_json(self.DRIVE_FILES_URL, params).get("files") or []
         return files[0]["id"] if files else None
 
     def create_folder(self, *, name: str, parent_id: str | None) -> str:
@@ -164,6 +252,62 @@ class GoogleDriveClient:
         existing = self.find_folder(name=name, parent_id=parent_id)
         return existing or self.create_folder(name=name, parent_id=parent_id)
 
+    def list_folder(
+        self,
+        *,
+        folder_id: str,
+        page_size: int = 50,
+        page_token: str | None = None,
+        fields: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        One page of a folder's direct children (not trashed), folders first.
+        Only the fields in `fields` are returned to keep responses small.
+        """
+        params: Dict[str, Any] = {
+            "q": f'"{folder_id}" in parents and trashed=false',
+            "fields": fields or self.LIST_FIELDS,
+            "orderBy": "folder,name",
+            "pageSize": page_size,
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        resp = self._session.get(self.DRIVE_FILES_URL, headers=self._headers(), params=params, timeout=30)
+        resp.raise_for_status()
+        return resp.json()
+
+    def list_images_modified_after(
+        self,
+        *,
+        folder_id: str,
+        modified_after: str | None,
+        page_token: str | None = None,
+        page_size: int = 1000,
+        fields: str = "nextPageToken,files(id,name,modifiedTime,createdTime,webViewLink)",
+    ) -> dict[str, Any]:
+        """
+        One page of images in a folder changed after `modified_after` (RFC 3339, as
+        returned by Drive), oldest first so the caller can advance a cursor page by page.
+        """
+        q = [
+            f'"{folder_id}" in parents',
+            "trashed=false",
+            'mimeType contains "image/"',
+        ]
+        if modified_after:
+            q.append(f'modifiedTime > "{modified_after}"')
+        params: Dict[str, Any] = {
+            "q": " and ".join(q),
+            "fields": fields,
+            "orderBy": "modifiedTime",
+            "pageSize": page_size,
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        resp = self._session.get(self.DRIVE_FILES_URL, headers=self._headers(), params=params, timeout=30)
+        resp.raise_for_status()
+        return resp.json()
+
     # ---------------- Drive: upload ----------------
 
     def upload_file(
@@ -173,6 +317,7 @@ class GoogleDriveClient:
         content_bytes: bytes,
         parent_id: str | None,
         mime_type: str | None = None,
+        app_properties: Dict[str, str] | None = None,
     ) -> dict[str, Any]:
         mime_type = mime_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
 
@@ -181,6 +326,9 @@ class GoogleDriveClient:
             meta["parents"] = [parent_id]
         else:
             meta["parents"] = ["root"]
+        if app_properties:
+            # Private to this OAuth client; lets us recognise our own uploads later
+            meta["appProperties"] = app_properties
 
         boundary = secrets.token_hex(16)
         meta_json = json.dumps(meta).encode("utf-8")
@@ -209,5 +357,5 @@ class GoogleDriveClient:
         return resp.json()
 
 
-__all__ = ["GoogleDriveClient", "GoogleAuthError"]
+__all__ = ["GoogleDriveClient", "GoogleAuthError", "ResponseCache"]
 
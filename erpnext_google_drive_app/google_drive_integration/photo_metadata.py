@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any, BinaryIO
+
+from PIL import Image, UnidentifiedImageError
+
+
+# EXIF tag ids (see PIL.ExifTags.TAGS / GPSTAGS)
+_TAG_MAKE = 0x010F
+_TAG_MODEL = 0x0110
+_TAG_ORIENTATION = 0x0112
+_TAG_DATETIME = 0x0132
+_TAG_DATETIME_ORIGINAL = 0x9003
+_IFD_EXIF = 0x8769
+_IFD_GPS = 0x8825
+_GPS_LAT_REF, _GPS_LAT, _GPS_LNG_REF, _GPS_LNG = 1, 2, 3, 4
+
+# Orientations where the stored image is rotated by 90/270 degrees
+_ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def read_photo_metadata(fp: BinaryIO) -> dict[str, Any]:
+    """
+    Capture time, GPS, camera and dimensions for a Project Photo, keyed by its fieldnames.
+
+    Image.open only parses the file header, so this reads the EXIF block without
+    decoding pixels. Missing or unreadable values are left out.
+    """
+    try:
+        with Image.open(fp) as img:
+            width, height = img.size
+            exif = img.getexif()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError):
+        # DecompressionBombError (very large images, e.g. stitched panoramas) is not an
+        # OSError; metadata is optional and must never block the upload
+        return {}
+
+    if exif.get(_TAG_ORIENTATION) in _ROTATED_ORIENTATIONS:
+        width, height = height, width
+
+    meta: dict[str, Any] = {"image_width": width, "image_height": height}
+
+    exif_ifd = exif.get_ifd(_IFD_EXIF)
+    captured_at = parse_exif_datetime(exif_ifd.get(_TAG_DATETIME_ORIGINAL) or exif.get(_TAG_DATETIME))
+    if captured_at:
+        meta["captured_at"] = captured_at
+
+    for fieldname, tag in (("camera_make", _TAG_MAKE), ("camera_model", _TAG_MODEL)):
+        value = _clean_text(exif.get(tag))
+        if value:
+            meta[fieldname] = value
+
+    gps = exif.get_ifd(_IFD_GPS)
+    lat = _gps_degrees(gps.get(_GPS_LAT), gps.get(_GPS_LAT_REF))
+    lng = _gps_degrees(gps.get(_GPS_LNG), gps.get(_GPS_LNG_REF))
+    if lat is not None and lng is not None and -90 <= lat <= 90 and -180 <= lng <= 180:
+        meta["gps_latitude"] = lat
+        meta["gps_longitude"] = lng
+
+    return meta
+
+
+def parse_exif_datetime(value: Any) -> dt.datetime | None:
+    """EXIF "YYYY:MM:DD HH:MM:SS" (camera local time) -> naive datetime."""
+    value = _clean_text(value)
+    if not value:
+        return None
+    try:
+        return dt.datetime.strptime(value[:19], "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+def _clean_text(value: Any) -> str | None:
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", "ignore")
+    if not isinstance(value, str):
+        return None
+    return value.strip("\x00 ").strip() or None
+
+
+def _gps_degrees(dms: Any, ref: Any) -> float | None:
+    try:
+        degrees, minutes, seconds = (float(v) for v in dms)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    value = degrees + minutes / 60 + seconds / 3600
+    if _clean_text(ref) in ("S", "W"):
+        value = -value
+    return round(value, 7)
+
+
+__all__ = ["read_photo_metadata", "parse_exif_datetime"]
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import time
+from typing import Any
+
+import frappe
+
+
+class RedisResponseCache:
+    """
+    ETag + body store for GoogleDriveClient metadata reads, kept in Redis.
+
+    Size is bounded two ways: bodies above `max_entry_bytes` are never stored,
+    and once more than `max_entries` are held the least recently used ones are
+    evicted (recency is tracked in a sorted set).
+    """
+
+    PREFIX = "google_drive_response"
+
+    def __init__(self, *, max_entries: int = 500, max_entry_bytes: int = 64 * 1024, ttl_seconds: int = 86400):
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl_seconds = ttl_seconds
+
+    def _redis(self):
+        return frappe.cache()
+
+    def _lru_key(self) -> str:
+        return self._redis().make_key(f"{self.PREFIX}|lru")
+
+    def _entry_key(self, key: str) -> str:
+        return self._redis().make_key(f"{self.PREFIX}|{key}")
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        redis = self._redis()
+        entry_key = self._entry_key(key)
+        raw = redis.get(entry_key)
+        if raw is None:
+            return None
+        redis.zadd(self._lru_key(), {entry_key: time.time()})
+        return json.loads(raw)
+
+    def set(self, key: str, entry: dict[str, Any]) -> None:
+        raw = json.dumps(entry, separators=(",", ":"))
+        if len(raw) > self.max_entry_bytes:
+            return
+
+        redis = self._redis()
+        entry_key = self._entry_key(key)
+        lru_key = self._lru_key()
+        redis.set(entry_key, raw, ex=self.ttl_seconds)
+        redis.zadd(lru_key, {entry_key: time.time()})
+
+        overflow = redis.zcard(lru_key) - self.max_entries
+        if overflow > 0:
+            victims = redis.zrange(lru_key, 0, overflow - 1)
+            if victims:
+                redis.delete(*victims)
+                redis.zrem(lru_key, *victims)
+
+
+__all__ = ["RedisResponseCache"]
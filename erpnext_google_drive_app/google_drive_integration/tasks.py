@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any
+
+import frappe
+from frappe.utils import convert_utc_to_system_timezone, now_datetime
+
+from erpnext_google_drive_app.google_drive_integration.doctype.google_drive_settings.google_drive_settings import (
+    get_drive_client,
+    get_settings_snapshot,
+    save_refreshed_token,
+)
+from erpnext_google_drive_app.google_drive_integration.doctype.project_photo.project_photo import (
+    DRIVE_APP_PROPERTY,
+)
+from erpnext_google_drive_app.google_drive_integration.folder_cache import invalidate_folder_listing
+from erpnext_google_drive_app.google_drive_integration.google_drive_client import GoogleDriveClient
+from erpnext_google_drive_app.google_drive_integration.photo_metadata import parse_exif_datetime
+from erpnext_google_drive_app.google_drive_integration.upload_scheduler import SCHEDULED, queue_pending_uploads
+
+
+# (stage, folder id field, cursor field) on Google Drive Project Folder
+_INGEST_FOLDERS = (
+    ("Before", "before_folder_id", "before_ingest_cursor"),
+    ("After", "after_folder_id", "after_ingest_cursor"),
+)
+
+_PHOTO_FIELDS = [
+    "name",
+    "creation",
+    "modified",
+    "owner",
+    "modified_by",
+    "docstatus",
+    "idx",
+    "project",
+    "stage",
+    "google_drive_file_id",
+    "google_drive_url",
+    "uploaded_at",
+    "captured_at",
+    "camera_make",
+    "camera_model",
+    "gps_latitude",
+    "gps_longitude",
+    "image_width",
+    "image_height",
+]
+
+# Drive already extracts EXIF into imageMediaMetadata, so ingest needs no download
+_INGEST_LIST_FIELDS = (
+    "nextPageToken,files(id,name,modifiedTime,createdTime,webViewLink,appProperties,"
+    "imageMediaMetadata(time,width,height,rotation,cameraMake,cameraModel,location))"
+)
+
+
+def ingest_drive_photos():
+    """
+    Scheduled: create Project Photo rows for images added directly in the projects'
+    Before/After Drive folders. Only files modified after each folder's cursor are
+    listed, nothing is downloaded and the upload hooks are bypassed.
+    """
+    settings = get_settings_snapshot()
+    if not settings.has_access_token and not settings.has_refresh_token:
+        return
+
+    client = get_drive_client(settings)
+
+    mappings = frappe.get_all(
+        "Google Drive Project Folder",
+        fields=["name", "project"] + [f for _, folder, cursor in _INGEST_FOLDERS for f in (folder, cursor)],
+    )
+    for mapping in mappings:
+        for stage, folder_field, cursor_field in _INGEST_FOLDERS:
+            folder_id = mapping.get(folder_field)
+            if not folder_id:
+                continue
+            try:
+                cursor = _ingest_folder(client, mapping.project, stage, folder_id, mapping.get(cursor_field))
+                if cursor != mapping.get(cursor_field):
+                    frappe.db.set_value(
+                        "Google Drive Project Folder", mapping.name, cursor_field, cursor, update_modified=False
+                    )
+                frappe.db.commit()
+            except Exception:
+                frappe.db.rollback()
+                frappe.log_error(
+                    title=f"Google Drive Ingest Error: {mapping.project} ({stage})",
+                    reference_doctype="Google Drive Project Folder",
+                    reference_name=mapping.name,
+                )
+
+    save_refreshed_token(client)
+
+
+def _ingest_folder(
+    client: GoogleDriveClient, project: str, stage: str, folder_id: str, cursor: str | None
+) -> str | None:
+    """Insert Project Photos for new files in one folder; returns the advanced cursor."""
+    inserted = 0
+    page_token = None
+    # The query must stay identical across pages for nextPageToken to be valid,
+    # so the advanced cursor is tracked separately and only returned at the end.
+    newest = cursor
+    while True:
+        page = client.list_images_modified_after(
+            folder_id=folder_id, modified_after=cursor, page_token=page_token, fields=_INGEST_LIST_FIELDS
+        )
+        files = page.get("files") or []
+        if files:
+            inserted += _insert_photos(project, stage, files)
+            # RFC 3339 timestamps in UTC compare correctly as strings
+            newest = max([newest or ""] + [f["modifiedTime"] for f in files if f.get("modifiedTime")]) or None
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            break
+
+    if inserted:
+        invalidate_folder_listing(folder_id)
+    return newest
+
+
+def _insert_photos(project: str, stage: str, files: list[dict[str, Any]]) -> int:
+    file_ids = [f["id"] for f in files]
+    # Skip files that already have a row (uploaded from ERPNext or ingested before)
+    known = set(
+        frappe.get_all(
+            "Project Photo",
+            filters={"google_drive_file_id": ["in", file_ids]},
+            pluck="google_drive_file_id",
+        )
+    )
+
+    now = now_datetime()
+    user = frappe.session.user
+    values = []
+    for f in files:
+        if f["id"] in known:
+            continue
+        # Uploaded from a Project Photo whose row may not be committed yet (or
+        # whose upload job died before saving the ID); that row owns the file
+        if (f.get("appProperties") or {}).get(DRIVE_APP_PROPERTY):
+            continue
+        known.add(f["id"])
+        image = f.get("imageMediaMetadata") or {}
+        location = image.get("location") or {}
+        width, height = image.get("width"), image.get("height")
+        if image.get("rotation") in (1, 3):
+            width, height = height, width
+        values.append(
+            (
+                frappe.generate_hash(length=10),
+                now,
+                now,
+                user,
+                user,
+                0,
+                0,
+                project,
+                stage,
+                f["id"],
+                f.get("webViewLink"),
+                _drive_time(f.get("createdTime") or f.get("modifiedTime")) or now,
+                parse_exif_datetime(image.get("time")),
+                image.get("cameraMake"),
+                image.get("cameraModel"),
+                location.get("latitude"),
+                location.get("longitude"),
+                width,
+                height,
+            )
+        )
+
+    if values:
+        frappe.db.bulk_insert("Project Photo", fields=_PHOTO_FIELDS, values=values)
+    return len(values)
+
+
+def _drive_time(value: str | None) -> dt.datetime | None:
+    """Drive RFC 3339 UTC timestamp -> naive datetime in the system timezone."""
+    if not value:
+        return None
+    utc = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return convert_utc_to_system_timezone(utc).replace(tzinfo=None)
+
+
+def retry_pending_uploads():
+    """Scheduled: re-queue Project Photos whose upload failed or never ran."""
+    if not get_settings_snapshot().auto_upload_project_photos:
+        return
+    queue_pending_uploads(SCHEDULED)
+
+
+__all__ = ["ingest_drive_photos", "retry_pending_uploads"]
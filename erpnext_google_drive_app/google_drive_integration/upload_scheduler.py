@@ -0,0 +1,226 @@
+"""
+Priority-aware queue in front of Project Photo uploads.
+
+Each priority class keeps, in Redis, one FIFO list of photos per project plus a
+ring of projects that have work. Drain jobs take one photo from the project at
+the head of the ring and rotate it to the tail, so a 2,000-photo backfill for
+one project cannot starve the others. Classes run on separate RQ queues with
+their own concurrency limit, so interactive saves never wait behind a backfill.
+"""
+
+from __future__ import annotations
+
+import time
+from functools import partial
+
+import frappe
+
+INTERACTIVE = "interactive"
+SCHEDULED = "scheduled"
+BACKFILL = "backfill"
+
+# Max drain jobs running at once per class
+CONCURRENCY = {INTERACTIVE: 4, SCHEDULED: 2, BACKFILL: 1}
+_RQ_QUEUE = {INTERACTIVE: "short", SCHEDULED: "default", BACKFILL: "long"}
+
+# A drain job hands the worker back after this many photos or this many seconds
+_DRAIN_BATCH = 25
+_DRAIN_SECONDS = 120
+# RQ timeout: the drain budget plus room for one slow upload (folder setup + 60 s upload)
+_JOB_TIMEOUT_SECONDS = _DRAIN_SECONDS + 300
+# A crashed drain job gives its slot back after this long
+_SLOT_LEASE_SECONDS = 600
+# Guards against a photo being queued twice if its queue entry is lost
+_QUEUED_FLAG_SECONDS = 86400
+# Times a photo whose row is missing or has no file yet is put back before it is dropped
+_MAX_NOT_READY_ATTEMPTS = 5
+
+_PREFIX = "google_drive_upload"
+
+
+def _key(*parts: str) -> str:
+    return "|".join((_PREFIX,) + parts)
+
+
+def _redis_key(*parts: str) -> str:
+    return frappe.cache().make_key(_key(*parts))
+
+
+def schedule_upload(photo: str, project: str, priority: str = INTERACTIVE) -> None:
+    """
+    Queue a Project Photo for upload once the current transaction commits, so a drain
+    job never sees the photo before its row does, and a rolled-back save queues nothing.
+    """
+    if priority not in CONCURRENCY:
+        frappe.throw(f"Unknown upload priority: {priority}")
+    frappe.db.after_commit.add(partial(_push, photo, project, priority))
+
+
+def _push(photo: str, project: str, priority: str, *, kick: bool = True) -> bool:
+    """Add an already committed photo to its class queue. Returns False if it is already queued."""
+    cache = frappe.cache()
+    if not cache.set(_redis_key("photo", photo), priority, nx=True, ex=_QUEUED_FLAG_SECONDS):
+        return False
+
+    cache.rpush(_key(priority, "project", project), photo)
+    # Join the ring only if the project is not already in rotation
+    if cache.set(_redis_key(priority, "active", project), 1, nx=True):
+        cache.rpush(_key(priority, "ring"), project)
+    if kick:
+        _kick(priority)
+    return True
+
+
+def _kick(priority: str) -> None:
+    # At most one drain job waiting to start per class; running jobs re-kick when done
+    if not frappe.cache().set(_redis_key(priority, "kick"), 1, nx=True, ex=60):
+        return
+    frappe.enqueue(
+        "erpnext_google_drive_app.google_drive_integration.upload_scheduler.process_upload_queue",
+        queue=_RQ_QUEUE[priority],
+        timeout=_JOB_TIMEOUT_SECONDS,
+        at_front=priority == INTERACTIVE,
+        priority=priority,
+    )
+
+
+def process_upload_queue(priority: str) -> None:
+    """RQ job: upload up to a batch of queued photos of one class, round-robin across projects."""
+    cache = frappe.cache()
+    cache.delete(_redis_key(priority, "kick"))
+
+    slot = _acquire_slot(priority)
+    if slot is None:
+        # Class is at its concurrency limit; the running jobs will get to it
+        return
+
+    deadline = time.monotonic() + _DRAIN_SECONDS
+    put_back: set[str] = set()
+    only_put_back_left = False
+    try:
+        for _ in range(_DRAIN_BATCH):
+            if time.monotonic() >= deadline:
+                break
+            item = _next_photo(priority)
+            if not item:
+                break
+            project, photo = item
+            if photo in put_back:
+                # Only photos that were not ready are left; leave them for a later job
+                _push(photo, project, priority, kick=False)
+                only_put_back_left = True
+                break
+            if not _upload(photo) and _retry_later(photo, project, priority):
+                put_back.add(photo)
+            cache.expire(slot, _SLOT_LEASE_SECONDS)
+    finally:
+        cache.delete(slot)
+
+    # Don't spin on a lone not-ready photo; the next save or the hourly retry kicks again
+    pending_projects = cache.llen(_key(priority, "ring"))
+    if pending_projects > (1 if only_put_back_left else 0):
+        _kick(priority)
+
+
+def _acquire_slot(priority: str) -> str | None:
+    cache = frappe.cache()
+    for i in range(CONCURRENCY[priority]):
+        slot = _redis_key(priority, "slot", str(i))
+        if cache.set(slot, 1, nx=True, ex=_SLOT_LEASE_SECONDS):
+            return slot
+    return None
+
+
+def _next_photo(priority: str) -> tuple[str, str] | None:
+    cache = frappe.cache()
+    ring = _key(priority, "ring")
+    while True:
+        project = cache.lpop(ring)
+        if project is None:
+            return None
+        project = frappe.safe_decode(project)
+        queue = _key(priority, "project", project)
+        photo = cache.lpop(queue)
+
+        # Leave the ring first, then rejoin if work remains, so a concurrent
+        # _push either sees the project inactive or sees us rejoin.
+        cache.delete(_redis_key(priority, "active", project))
+        if cache.llen(queue) and cache.set(_redis_key(priority, "active", project), 1, nx=True):
+            cache.rpush(ring, project)
+
+        if photo is not None:
+            photo = frappe.safe_decode(photo)
+            cache.delete(_redis_key("photo", photo))
+            return project, photo
+
+
+def _upload(photo: str) -> bool:
+    """Upload one photo. Returns False if its row is missing or has no file yet."""
+    from erpnext_google_drive_app.google_drive_integration.doctype.project_photo.project_photo import (
+        upload_project_photo,
+    )
+
+    try:
+        ready = upload_project_photo(photo)
+        if ready:
+            frappe.db.commit()
+        else:
+            # End the read snapshot so the next attempt can see newly committed rows
+            frappe.db.rollback()
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(
+            title="Google Drive Upload Error", reference_doctype="Project Photo", reference_name=photo
+        )
+        # Failed uploads are picked up again by the hourly retry
+        ready = True
+
+    if ready:
+        frappe.cache().delete(_redis_key("attempts", photo))
+    return ready
+
+
+def _retry_later(photo: str, project: str, priority: str) -> bool:
+    """Put a not-ready photo back on its queue, up to _MAX_NOT_READY_ATTEMPTS times."""
+    cache = frappe.cache()
+    attempts_key = _redis_key("attempts", photo)
+    attempts = cache.incr(attempts_key)
+    cache.expire(attempts_key, _QUEUED_FLAG_SECONDS)
+    if attempts > _MAX_NOT_READY_ATTEMPTS:
+        cache.delete(attempts_key)
+        return False
+    return _push(photo, project, priority, kick=False)
+
+
+def queue_pending_uploads(priority: str, project: str | None = None) -> int:
+    """Queue every Project Photo that has a file but no Drive file yet."""
+    filters = {"google_drive_file_id": ["is", "not set"], "photo": ["is", "set"]}
+    if project:
+        filters["project"] = project
+    pending = frappe.get_all("Project Photo", filters=filters, fields=["name", "project"], order_by="creation asc")
+    # Rows are already committed, so they can go straight onto the queue
+    queued = sum(_push(p.name, p.project, priority) for p in pending)
+    kick_stalled_queues()
+    return queued
+
+
+def kick_stalled_queues() -> None:
+    """
+    Start a drain job for every class that still has queued work. Recovers queues whose
+    drain job was killed before re-kicking.
+    """
+    cache = frappe.cache()
+    for priority in CONCURRENCY:
+        if cache.llen(_key(priority, "ring")):
+            _kick(priority)
+
+
+__all__ = [
+    "BACKFILL",
+    "INTERACTIVE",
+    "SCHEDULED",
+    "kick_stalled_queues",
+    "process_upload_queue",
+    "queue_pending_uploads",
+    "schedule_upload",
+]
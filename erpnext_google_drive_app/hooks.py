@@ -24,3 +24,16 @@ add_to_apps_screen = [
     }
 ]
 
+
+# Pick up photos dropped straight into the projects' Before/After Drive folders,
+# and retry Project Photo uploads that failed
+scheduler_events = {
+    "cron": {
+        "*/15 * * * *": [
+            "erpnext_google_drive_app.google_drive_integration.tasks.ingest_drive_photos",
+        ],
+    },
+    "hourly": [
+        "erpnext_google_drive_app.google_drive_integration.tasks.retry_pending_uploads",
+    ],
+}
@@ -56,13 +56,80 @@ frappe.ui.form.on("Project", {
 				}
 				html += `</div>`;
 				html += `</div>`;
-				html += `<div class="mt-2"><a href="/app/project-photo?project=${encodeURIComponent(frm.doc.name)}" class="btn btn-sm btn-default">${__("Add / view all Project Photos")}</a></div>`;
+				html += `<div class="mt-2"><a href="/app/project-photo?project=${encodeURIComponent(frm.doc.name)}" class="btn btn-sm btn-default">${__("Add / view all Project Photos")}</a>`;
+				html += ` <button class="btn btn-sm btn-default btn-browse-drive-folder">${__("Browse Drive Folder")}</button></div>`;
 
 				const body = frm.dashboard.add_section(html, __("Project Photos"));
-				if (body && body.length) body.closest(".form-dashboard-section").addClass("project-photos-dashboard-section");
+				if (body && body.length) {
+					body.closest(".form-dashboard-section").addClass("project-photos-dashboard-section");
+					body.find(".btn-browse-drive-folder").on("click", () => frm.trigger("browse_drive_folder"));
+				}
 			})
 			.catch(() => {
 				// No permission or doctype not found
 			});
 	},
+	browse_drive_folder: function (frm) {
+		const dialog = new frappe.ui.Dialog({
+			title: __("Google Drive Folder"),
+			fields: [
+				{
+					fieldname: "folder",
+					fieldtype: "Select",
+					label: __("Folder"),
+					options: "Project\nBefore\nAfter",
+					default: "Before",
+					onchange: () => load(true),
+				},
+				{ fieldname: "listing", fieldtype: "HTML" },
+			],
+		});
+		let next_page_token = null;
+
+		const file_row = (f) => {
+			const name = frappe.utils.escape_html(f.name || f.id);
+			const label = f.webViewLink ? `<a href="${f.webViewLink}" target="_blank">${name}</a>` : name;
+			const when = f.modifiedTime ? frappe.datetime.comment_when(f.modifiedTime) : "";
+			return `<div class="drive-file-row small mb-1">${label} <span class="text-muted">${when}</span></div>`;
+		};
+
+		const load = (reset) => {
+			const $wrapper = dialog.fields_dict.listing.$wrapper;
+			if (reset) {
+				next_page_token = null;
+				$wrapper.html(`<p class="text-muted small">${__("Loading...")}</p>`);
+			}
+			frappe
+				.call({
+					method: "erpnext_google_drive_app.google_drive_integration.api.list_project_drive_folder",
+					args: {
+						project: frm.doc.name,
+						folder: dialog.get_value("folder"),
+						page_token: next_page_token,
+					},
+				})
+				.then((r) => {
+					const data = r.message || {};
+					if (reset) $wrapper.empty();
+					$wrapper.find(".btn-drive-load-more").remove();
+					if (!data.folder_id) {
+						$wrapper.html(`<p class="text-muted small">${__("No Drive folder linked to this project yet.")}</p>`);
+						return;
+					}
+					if (reset && !(data.files || []).length) {
+						$wrapper.html(`<p class="text-muted small">${__("Folder is empty.")}</p>`);
+					}
+					$wrapper.append((data.files || []).map(file_row).join(""));
+					next_page_token = data.next_page_token;
+					if (next_page_token) {
+						$(`<button class="btn btn-xs btn-default btn-drive-load-more mt-2">${__("Load more")}</button>`)
+							.appendTo($wrapper)
+							.on("click", () => load(false));
+					}
+				});
+		};
+
+		dialog.show();
+		load(true);
+	},
 });